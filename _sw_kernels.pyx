@@ -0,0 +1,51 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+"""Compiled kernels for soundwave, used when the extension has been built."""
+
+from libc.math cimport rint
+from libc.stdint cimport int16_t, uint32_t
+
+# Interface version checked by soundwave; bump it when a kernel signature changes
+KERNEL_VERSION = 2
+
+
+def gen_sine_lut_int16(
+    Py_ssize_t n,
+    uint32_t phase_inc,
+    double amplitude,
+    const float[::1] lut,
+    int16_t[::1] out,
+    uint32_t start_phase=0,
+):
+    """Fills out[:n] with amplitude * sin() from a quarter-period table, saturating to int16.
+
+    Same algorithm as soundwave._gen_sine_lut_int16: the phase starts at
+    start_phase and advances by phase_inc per sample. The top 2 bits of the
+    32-bit phase pick the quadrant, the next lut_bits bits the table entry and
+    the rest the interpolation fraction.
+    """
+    cdef int lut_bits = (lut.shape[0] - 2).bit_length() - 1
+    cdef int fraction_bits = 30 - lut_bits
+    cdef uint32_t fraction_mask = (1u << fraction_bits) - 1
+    cdef double fraction_scale = 1.0 / (1u << fraction_bits)
+    cdef uint32_t phase = start_phase, position, index
+    cdef double value
+    cdef Py_ssize_t k
+    with nogil:
+        for k in range(n):
+            position = phase & 0x3FFFFFFFu
+            if phase & 0x40000000u:
+                position = 0x40000000u - position
+            index = position >> fraction_bits
+            value = lut[index] + (position & fraction_mask) * fraction_scale * (
+                lut[index + 1] - lut[index]
+            )
+            if phase & 0x80000000u:
+                value = -value
+            value = rint(amplitude * value)
+            if value > 32767:
+                value = 32767
+            elif value < -32768:
+                value = -32768
+            out[k] = <int16_t>value
+            phase += phase_inc
+    return out.base
@@ -0,0 +1,27 @@
+import os
+
+from Cython.Build import cythonize
+from setuptools import Extension, setup
+
+# Host-specific flags (-march=native, -ffast-math) make the wheel non-portable and
+# can change rounding, so they are only used when explicitly requested
+if os.environ.get("SOUNDWAVE_NATIVE") and os.name != "nt":
+    compile_args = ["-O3", "-march=native", "-ffast-math"]
+else:
+    compile_args = []
+
+setup(
+    name="soundwave",
+    py_modules=["soundwave"],
+    ext_modules=cythonize(
+        [
+            # The kernel is optional: soundwave falls back to NumPy when the build fails
+            Extension(
+                "_sw_kernels",
+                ["_sw_kernels.pyx"],
+                extra_compile_args=compile_args,
+                optional=True,
+            )
+        ]
+    ),
+)
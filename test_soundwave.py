@@ -1,5 +1,11 @@
+import importlib.util
 import os
+import sys
+import types
+import numpy as np
 import pytest
+from scipy.io import wavfile
+import soundwave
 from soundwave import SoundWaveFactory
 
 @pytest.fixture
@@ -12,6 +18,147 @@ def test_create_note(sound_wave_factory):
     sound_wave = sound_wave_factory.create_note()
     assert sound_wave is not None, "No sound wave generated for note 'a4'"
 
+def test_generate_note_writes_no_file(sound_wave_factory, tmp_path, monkeypatch):
+    """Test that generating a note does not write any file."""
+    monkeypatch.chdir(tmp_path)
+    sound_wave = sound_wave_factory.generate_note(note="c4")
+    assert sound_wave is not None, "No sound wave generated for note 'c4'"
+    assert not any(tmp_path.iterdir()), "File written by generate_note"
+
+def test_create_note_cached():
+    """Test that repeated notes reuse the cached sound wave."""
+    factory1 = SoundWaveFactory()
+    factory2 = SoundWaveFactory()
+    assert factory1.create_note() is factory2.create_note(), "Cached wave not reused for note 'a4'"
+
+def test_create_notes():
+    """Test generating several notes in one batch."""
+    factory = SoundWaveFactory()
+    sound_waves = factory.create_notes(["c4", "e5", "g4"])
+    assert sound_waves.shape == (3, SoundWaveFactory.SOUND_ARRAY_LEN), "Batch has wrong shape"
+    for note, sound_wave in zip(["c4", "e5", "g4"], sound_waves):
+        assert (sound_wave == SoundWaveFactory().generate_note(note)).all(), f"Batch differs for '{note}'"
+    for file_name in ("c4_sin.wav", "e5_sin.wav", "g4_sin.wav"):
+        assert os.path.exists(file_name), f"{file_name} not saved"
+        os.remove(file_name)
+
+def test_stream_note(sound_wave_factory):
+    """Test that streaming a note writes the same WAV samples as generating it."""
+    sound_wave = sound_wave_factory.generate_note(note="b3")
+    file_name = sound_wave_factory.stream_note(note="b3", name="b3_stream")
+    sampling_rate, streamed_wave = wavfile.read(file_name)
+    os.remove(file_name)
+    assert sampling_rate == SoundWaveFactory.SAMPLING_RATE, "Streamed WAV has wrong sampling rate"
+    assert (streamed_wave == sound_wave).all(), "Streamed wave differs from generated wave"
+
+def test_create_note_cached_per_subclass():
+    """Test that subclasses with another duration or amplitude do not get the parent's cached wave."""
+    class ShortSoundWaveFactory(SoundWaveFactory):
+        DURATION_SECONDS = 1
+        SOUND_ARRAY_LEN = SoundWaveFactory.SAMPLING_RATE * DURATION_SECONDS
+
+    class LoudSoundWaveFactory(SoundWaveFactory):
+        MAX_AMPLITUDE = 2**14
+
+    SoundWaveFactory().generate_note()
+    sound_wave = ShortSoundWaveFactory().generate_note()
+    assert len(sound_wave) == ShortSoundWaveFactory.SOUND_ARRAY_LEN, "Parent's cached wave returned"
+    sound_wave = LoudSoundWaveFactory().generate_note()
+    assert sound_wave.max() > SoundWaveFactory.MAX_AMPLITUDE, "Parent's cached wave returned"
+
+def test_notes_per_subclass():
+    """Test that a subclass overriding NOTES gets its own frequencies."""
+    class RetunedSoundWaveFactory(SoundWaveFactory):
+        NOTES = {**SoundWaveFactory.NOTES, "a4": 432.0, "x9": 100.0}
+
+    SoundWaveFactory().get_frequency("a4")
+    factory = RetunedSoundWaveFactory()
+    assert factory.get_frequency("a4") == 432.0, "Overridden note frequency ignored"
+    assert factory.get_frequency("x9") == 100.0, "Added note not found"
+    assert SoundWaveFactory().get_frequency("a4") == 440.0, "Base class frequency changed"
+
+def test_timeline_per_subclass():
+    """Test that a subclass with another duration builds its own timeline."""
+    class ShortSoundWaveFactory(SoundWaveFactory):
+        DURATION_SECONDS = 1
+        SOUND_ARRAY_LEN = SoundWaveFactory.SAMPLING_RATE * DURATION_SECONDS
+
+    SoundWaveFactory()
+    timeline = ShortSoundWaveFactory().common_timeline
+    assert len(timeline) == ShortSoundWaveFactory.SOUND_ARRAY_LEN, "Parent's timeline reused"
+
+def test_create_notes_matches_generate_note():
+    """Test that a single-note batch equals the per-note wave, also for uncached notes."""
+    for note in ("d#7", "e0"):
+        SoundWaveFactory._wave_cache().pop(note, None)
+        sound_waves = SoundWaveFactory().create_notes([note])
+        os.remove(SoundWaveFactory._wav_file_name(note))
+        assert (sound_waves[0] == SoundWaveFactory().generate_note(note)).all(), f"Batch differs for '{note}'"
+
+def test_stale_kernel_extension_ignored(monkeypatch):
+    """Test that an extension built with an older kernel interface is not used."""
+    stale_kernels = types.ModuleType("_sw_kernels")
+    stale_kernels.gen_sine_lut_int16 = None
+    monkeypatch.setitem(sys.modules, "_sw_kernels", stale_kernels)
+    # Keeps numba's on-disk cache out of this second copy of the module
+    monkeypatch.setitem(sys.modules, "numba", None)
+
+    spec = importlib.util.spec_from_file_location("soundwave_stale", soundwave.__file__)
+    module = importlib.util.module_from_spec(spec)
+    monkeypatch.setitem(sys.modules, "soundwave_stale", module)
+    spec.loader.exec_module(module)
+    assert module._sw_kernels is None, "Stale kernel extension was used"
+    assert len(module.SoundWaveFactory().generate_note()) == SoundWaveFactory.SOUND_ARRAY_LEN
+
+def test_generate_note_accuracy():
+    """Test that the highest note stays within 2 LSB of a float64 sine."""
+    factory = SoundWaveFactory()
+    sound_wave = factory.generate_note(note="d#7")
+    timeline = np.linspace(0, factory.DURATION_SECONDS, num=factory.SOUND_ARRAY_LEN)
+    expected_wave = np.rint(
+        factory.MAX_AMPLITUDE * np.sin(2 * np.pi * factory.NOTES["d#7"] * timeline)
+    )
+    assert np.abs(sound_wave - expected_wave).max() <= 2, "Wave for 'd#7' is not accurate to 2 LSB"
+
+def test_generate_note_custom_timeline_accuracy():
+    """Test that a custom timeline gives the same wave as the common one within 2 LSB."""
+    factory = SoundWaveFactory()
+    expected_wave = factory.generate_note(note="d#7").astype(np.int32)
+    timeline = np.linspace(0, factory.DURATION_SECONDS, num=factory.SOUND_ARRAY_LEN)
+    sound_wave = factory.generate_note(note="d#7", timeline=timeline)
+    assert np.abs(sound_wave - expected_wave).max() <= 2, "Custom timeline wave is not accurate"
+
+def test_get_normed_sin_returns_new_array():
+    """Test that get_normed_sin does not hand out a shared buffer."""
+    factory = SoundWaveFactory()
+    timeline = np.linspace(0, 1, num=100)
+    first_wave = factory.get_normed_sin(timeline, 440.0)
+    second_wave = factory.get_normed_sin(timeline, 880.0)
+    assert not np.shares_memory(first_wave, second_wave), "Sine waves share memory"
+
+def test_lut_kernels_match():
+    """Test that the numba and Cython table kernels produce identical samples."""
+    numba = pytest.importorskip("numba")
+    if soundwave._sw_kernels is None:
+        pytest.skip("_sw_kernels extension is not built")
+    numba_kernel = numba.njit(soundwave._gen_sine_lut_int16)
+
+    phase_inc = SoundWaveFactory._phase_increment(SoundWaveFactory.NOTES["d#7"])
+    for start_phase in (0, 3 << 30, 0xFFFFFFFF):
+        args = (50000, phase_inc, SoundWaveFactory.MAX_AMPLITUDE, soundwave._SIN_LUT)
+        numba_wave = numba_kernel(*args, np.empty(50000, dtype=np.int16), start_phase)
+        cython_wave = soundwave._sw_kernels.gen_sine_lut_int16(
+            *args, np.empty(50000, dtype=np.int16), start_phase
+        )
+        assert (numba_wave == cython_wave).all(), f"Kernels differ for start phase {start_phase}"
+
+def test_save_wave_as_npy(sound_wave_factory):
+    """Test saving the sound wave as a .npy file."""
+    sound_wave_factory.create_note()
+    sound_wave_factory.save_wave('a4_sin.npy')
+    assert os.path.exists('a4_sin.npy'), ".npy file not saved"
+    os.remove('a4_sin.npy')
+
 def test_save_wave_as_txt(sound_wave_factory):
     """Test saving the sound wave as a .txt file."""
     sound_wave_factory.create_note()
@@ -26,6 +173,14 @@ def test_save_wave_as_wav(sound_wave_factory):
     assert os.path.exists('a4_sin.wav'), ".wav file not saved"
     os.remove('a4_sin.wav')
 
+def test_save_wave_infers_txt(sound_wave_factory):
+    """Test that a .txt file name without a file_type is still saved as text."""
+    sound_wave = sound_wave_factory.create_note()
+    sound_wave_factory.save_wave('a4_sin.txt')
+    loaded_wave = np.loadtxt('a4_sin.txt', dtype=np.int16)
+    os.remove('a4_sin.txt')
+    assert (loaded_wave == sound_wave).all(), ".txt file not saved as text"
+
 def test_read_wave_from_txt(sound_wave_factory):
     """Test reading the sound wave from a .txt file."""
     sound_wave_factory.create_note()
@@ -34,6 +189,27 @@ def test_read_wave_from_txt(sound_wave_factory):
     assert sound_wave_factory.sound_wave is not None, "No wave loaded from .txt file"
     os.remove('a4_sin.txt')
 
+def test_read_wave_from_txt_values(sound_wave_factory):
+    """Test that reading a .txt file restores the saved samples."""
+    sound_wave = sound_wave_factory.create_note()
+    sound_wave_factory.save_wave('a4_sin.txt', file_type='txt')
+    reader = SoundWaveFactory()
+    reader.read_wave_from_txt('a4_sin.txt')
+    os.remove('a4_sin.txt')
+    assert reader.sound_wave is not None, "No wave loaded from .txt file"
+    assert reader.sound_wave.dtype == np.int16, "Loaded wave is not int16"
+    assert (reader.sound_wave == sound_wave).all(), "Wave changed after .txt round trip"
+
+def test_read_wave_from_npy(sound_wave_factory):
+    """Test reading the sound wave back from a .npy file."""
+    sound_wave = sound_wave_factory.create_note()
+    sound_wave_factory.save_wave('a4_sin.npy')
+    reader = SoundWaveFactory()
+    reader.read_wave_from_txt('a4_sin.npy')
+    os.remove('a4_sin.npy')
+    assert reader.sound_wave is not None, "No wave loaded from .npy file"
+    assert (reader.sound_wave == sound_wave).all(), "Wave changed after .npy round trip"
+
 def test_normalize_sound_waves():
     """Test normalizing sound waves of different lengths and amplitudes."""
     factory1 = SoundWaveFactory()